@@ -1,7 +1,14 @@
 import os
 import re
+import sys
+import html
 from pathlib import Path
+from array import array
 from collections import defaultdict
+from itertools import groupby
+from bisect import bisect_right
+from functools import lru_cache
+import ahocorasick
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
@@ -15,102 +22,269 @@ ROOT_DIR = "./sample_project"            # LaTeX project root
 OUTPUT_NAME = "output_sample.pdf" # The name of the output PDF report
 # ======================================================================
 
+_INCLUDE_RE = re.compile(r"\\(?:input|include)\{([^}]+)\}")
+
+
 def read_latex_recursive(filename, seen=None):
-    """Recursively gather text from all \input/\include files."""
+    """Gather text from all \input/\include files.
+
+    Returns `(paths, line_nos, lines, file_texts, newline_idx)`: per-line arrays in
+    document order, plus each file's full text and sorted newline offsets.
+    """
     if seen is None:
         seen = set()
-    path = Path(ROOT_DIR) / filename
-    if path in seen or not path.exists():
-        return []
-    seen.add(path)
-
-    with open(path, encoding="utf-8") as f:
-        lines = f.readlines()
-
-    entries = []
-    pattern = re.compile(r"\\(?:input|include)\{([^}]+)\}")
-    for i, line in enumerate(lines, start=1):
-        entries.append((path, i, line.strip()))
-        for match in pattern.findall(line):
-            included = match.strip()
-            if not included.endswith(".tex"):
-                included += ".tex"
-            entries += read_latex_recursive(included, seen)
+    paths, line_nos, lines, file_texts, newline_idx = entries = ([], array("i"), [], {}, {})
+
+    def read_lines(path, file_lines):
+        """Record the lines of `path`, yielding each file it includes as it is reached."""
+        for i, line in enumerate(file_lines, start=1):
+            paths.append(path)  # one shared Path object per file
+            line_nos.append(i)
+            lines.append(line.strip())
+            # Cheap check first: most lines include nothing
+            if "\\in" not in line:
+                continue
+            for match in _INCLUDE_RE.findall(line):
+                included = match.strip()
+                if not included.endswith(".tex"):
+                    included += ".tex"
+                yield included
+
+    # Each stack entry yields the files still to be read from one open file, so
+    # included lines come right after the line including them
+    stack = [iter([filename])]
+    while stack:
+        included = next(stack[-1], None)
+        if included is None:
+            stack.pop()
+            continue
+        path = Path(ROOT_DIR) / included
+        if path in seen or not path.exists():
+            continue
+        seen.add(path)
+
+        text = path.read_text(encoding="utf-8")
+        file_texts[path] = text
+        newline_idx[path] = [m.start() for m in re.finditer("\n", text)]
+
+        file_lines = text.split("\n")
+        if file_lines[-1] == "":
+            file_lines.pop()
+        stack.append(read_lines(path, file_lines))
     return entries
 
 
+def _document_runs(entries, start=0):
+    """Yield `(path, text, newlines, begin, end)` for each run of same-file lines from line index `start`.
+
+    `begin` and `end` are offsets into `text`; `newlines` is the file's newline index for `_locate`.
+    """
+    paths, line_nos, _, file_texts, newline_idx = entries
+    index = start
+    # Paths are shared per file, so runs are grouped by identity instead of Path equality
+    for _, run in groupby(paths[start:], key=id):
+        count = sum(1 for _ in run)
+        path = paths[index]
+        text = file_texts[path]
+        newlines = newline_idx[path]
+        first, last = line_nos[index], line_nos[index + count - 1]
+        begin = newlines[first - 2] + 1 if first > 1 else 0
+        end = newlines[last - 1] if last <= len(newlines) else len(text)
+        yield path, text, newlines, begin, end
+        index += count
+
+
+def _locate(text, newlines, pos):
+    """Return `(line_no, line)` for the line of `text` containing offset `pos`."""
+    line_index = bisect_right(newlines, pos)
+    start = newlines[line_index - 1] + 1 if line_index else 0
+    end = newlines[line_index] if line_index < len(newlines) else len(text)
+    return line_index + 1, text[start:end]
+
+
+# Definitions must sit on one line, as when lines were matched one at a time
+_NEWACRO_RE = re.compile(
+    r"\\newacronym\{([^\}\n]+)\}\{([^\}\n]+)\}\{([^\}\n]+)\}"
+)
+
+
 def extract_defined_acronyms(entries):
     """Extract acronym definitions from \newacronym commands."""
     acronym_defs = {}
-    pattern = re.compile(
-        r"\\newacronym\{([^\}]+)\}\{([^\}]+)\}\{([^\}]+)\}"
-    )
-    for path, line_no, line in entries:
-        match = pattern.search(line)
-        if match:
+    for path, text, newlines, begin, end in _document_runs(entries):
+        for match in _NEWACRO_RE.finditer(text, begin, end):
             key, short, full = match.groups()
             acronym_defs[key] = {
                 "short": short.strip(),
                 "full": full.strip(),
                 "file": path,
-                "line": line_no,
+                "line": bisect_right(newlines, match.start()) + 1,
             }
     return acronym_defs
 
 
+@lru_cache(maxsize=None)
+def _escape(text):
+    """Return `re.escape(text)`, memoized for acronyms and full forms escaped in several places."""
+    return re.escape(text)
+
+
+def _is_word_boundary(text, pos):
+    """Return True if `pos` in `text` is a word boundary, as `\\b` would match it."""
+    before = pos > 0 and (text[pos - 1].isalnum() or text[pos - 1] == "_")
+    after = pos < len(text) and (text[pos].isalnum() or text[pos] == "_")
+    return before != after
+
+
+# Lowercase letters that re.IGNORECASE treats as equal to another letter although
+# str.lower() keeps them apart ("ı"/"i", "ſ"/"s", "µ"/"μ", "ς"/"σ", Greek and Cyrillic
+# variant forms), mapped onto that letter. U+0345 is left out: it is not a word
+# character, so folding it would move word boundaries.
+_CASE_FOLDS = str.maketrans(
+    "\u0131\u017f\u00b5\u1fbe\u1fd3\u1fe3\u03d0\u03f5\u03d1\u03f0\u03d6\u03f1\u03c2\u03d5"
+    "\u1c80\u1c81\u1c82\u1c83\u1c84\u1c85\u1c86\u1c87\ua64b\u1e9b\ufb06",
+    "is\u03bc\u03b9\u0390\u03b0\u03b2\u03b5\u03b8\u03ba\u03c0\u03c1\u03c3\u03c6"
+    "\u0432\u0434\u043e\u0441\u0442\u0442\u044a\u0463\u1c88\u1e61\ufb05",
+)
+
+
+def _lower_text(text):
+    """Lowercase `text` the way re.IGNORECASE compares it, without changing its length."""
+    # "İ" is the only character whose lowercase form is longer
+    lowered = text.replace("İ", "i").lower()
+    return lowered if lowered.isascii() else lowered.translate(_CASE_FOLDS)
+
+
+def _build_automaton(words):
+    """Build an Aho-Corasick automaton mapping each lowercased word to `(length, values)`."""
+    automaton = ahocorasick.Automaton()
+    for word, values in words.items():
+        automaton.add_word(word, (len(word), values))
+    automaton.make_automaton()
+    return automaton
+
+
+def _build_form_automaton(acronym_defs, field):
+    """Build an automaton mapping each lowercased `field` form, and its plural, to acronym keys."""
+    words = defaultdict(list)
+    for key, data in acronym_defs.items():
+        form = _lower_text(data[field])
+        words[form].append(key)
+        words[form + "s"].append(key)
+    return _build_automaton(words)
+
+
+def _match_automaton(automaton, lowered, begin, end):
+    """Yield `(pos, end, values)` for every whole-word match in `lowered[begin:end]`, overlaps included."""
+    for last, (length, values) in automaton.iter(lowered, begin, end):
+        pos = last + 1 - length
+        if _is_word_boundary(lowered, last + 1) and _is_word_boundary(lowered, pos):
+            yield pos, last + 1, values
+
+
+def _add_usage(usages, path, text, newlines, pos):
+    """Record the line containing `pos` in `usages` unless it is already the last entry."""
+    line_no, line = _locate(text, newlines, pos)
+    if usages and usages[-1][1] == line_no and usages[-1][0] == path:
+        return
+    usages.append((path, line_no, line.strip()))
+
+
+def _char_ranges(codes):
+    """Return a regex character-class body matching the ascending code points `codes`."""
+    ranges = []
+    for code in codes:
+        if ranges and ranges[-1][1] == code - 1:
+            ranges[-1][1] = code
+        else:
+            ranges.append([code, code])
+    return ''.join(
+        re.escape(chr(first)) + (f'-{re.escape(chr(last))}' if last > first else '')
+        for first, last in ranges
+    )
+
+
+# Common connecting words allowed inside a full form such as "Austrian Institute of Technology"
+_CONNECTORS = frozenset({'of', 'and', 'for', 'the', '&', 'to', 'in', 'on', 'with', 'at', 'by', 'from', 'de'})
+# Uppercase letters (str.isupper) of all of Unicode, since re has no \p{Lu}
+_UPPERCASE = _char_ranges(c for c in range(sys.maxunicode + 1) if chr(c).isupper())
+# A full-form word: starts with a capital letter, or is a connector in any letter case
+_FULLFORM_WORD = r'(?:[%s]\S*|%s)' % (
+    _UPPERCASE,
+    '|'.join(''.join(f'[{c}{c.upper()}]' if c.isalpha() else re.escape(c) for c in word) for word in sorted(_CONNECTORS)),
+)
+# The last (up to 5) consecutive full-form words at the end of the searched text
+_FULLFORM_RE = re.compile(rf'(?<!\S)((?:{_FULLFORM_WORD}\s+){{0,4}}{_FULLFORM_WORD})\s*$')
+
+
+def _full_form_words(text, end):
+    """Return the last (up to 5) capitalized or connecting words right before `text[end]`."""
+    # Only the last 5 words can be part of it, so search just that window
+    words = text[:end].rsplit(None, 5)
+    start = len(words[0]) if len(words) > 5 else 0
+    match = _FULLFORM_RE.search(text, start, end)
+    return match.group(1).split() if match else []
+
+
+# An acronym in parentheses, e.g. "(AIT)"
+_UNDEFINED_RE = re.compile(r"\(([A-Z]{2,10})\)")
+# Roman numerals to exclude (common section titles)
+_ROMAN_NUMERALS = frozenset({'I', 'II', 'III', 'IV', 'V', 'VI', 'VII', 'VIII', 'IX', 'X',
+                             'XI', 'XII', 'XIII', 'XIV', 'XV', 'XVI', 'XVII', 'XVIII', 'XIX', 'XX'})
+
+
 def scan_acronyms(entries, acronym_defs):
     """Scan all files for defined and undefined acronym usages."""
     used_full = defaultdict(list)
     used_short = defaultdict(list)
 
-    # Find the start of document content
-    document_started = False
-    content_entries = []
-    
-    for path, line_no, line in entries:
-        if not document_started and "\\begin{document}" in line:
-            document_started = True
-        if document_started:
-            content_entries.append((path, line_no, line))
-
-    for key, data in acronym_defs.items():
-        full = data["full"]
-        short = data["short"]
+    _, _, lines, file_texts, _ = entries
 
-        # Create comprehensive patterns for full forms (case-insensitive, plural variations)
-        # Handle both simple plurals (s) and common word-ending changes
-        escaped_full = re.escape(full)
-        # For "World Model" -> matches "world model", "World Models", "world models", etc.
-        full_pattern = re.compile(rf"\b{escaped_full}s?\b", re.IGNORECASE)
-        
-        # Also handle acronym short forms with plurals
-        escaped_short = re.escape(short)
-        short_pattern = re.compile(rf"\b{escaped_short}s?\b", re.IGNORECASE)
+    # Find the start of document content; only content after \begin{document}
+    # is scanned, one whole run of lines at a time
+    content_start = next(
+        (i for i, line in enumerate(lines) if "\\begin{document}" in line), len(lines)
+    )
+    content_runs = list(_document_runs(entries, content_start))
+    lowered_texts = {path: _lower_text(file_texts[path]) for path, *_ in content_runs}
 
-        # Only scan content after \begin{document}
-        for path, line_no, line in content_entries:
-            if full_pattern.search(line):
-                used_full[key].append((path, line_no, line))
-            if short_pattern.search(line):
-                used_short[key].append((path, line_no, line))
+    # Full and short forms are plain literals, so each kind is found with one automaton pass
+    if acronym_defs:
+        full_automaton = _build_form_automaton(acronym_defs, "full")
+        short_automaton = _build_form_automaton(acronym_defs, "short")
 
     # --- Detect undefined acronyms via "(ACRONYM)" pattern
     undefined = []
     undefined_counts = defaultdict(list)  # Track all occurrences
     undefined_full_forms = {}  # Track what full forms we find for undefined acronyms
-    pattern = re.compile(r"\(([A-Z]{2,10})\)")
-    defined_shorts = {v["short"] for v in acronym_defs.values()}
-    
-    # Roman numerals to exclude (common section titles)
-    roman_numerals = {'I', 'II', 'III', 'IV', 'V', 'VI', 'VII', 'VIII', 'IX', 'X', 
-                     'XI', 'XII', 'XIII', 'XIV', 'XV', 'XVI', 'XVII', 'XVIII', 'XIX', 'XX'}
-
-    # Only scan content after \begin{document} for undefined acronyms too
-    for path, line_no, line in content_entries:
-        for match in pattern.findall(line):
-            acronym = match.strip()
-            if acronym not in defined_shorts and acronym not in roman_numerals:
-                undefined_counts[acronym].append((path, line_no, line.strip()))
+    acronym_patterns = {}  # Compiled "(ACRONYM)" pattern per acronym
+    # Glossary acronyms and Roman numerals are skipped with a single set lookup
+    excluded = {v["short"] for v in acronym_defs.values()} | _ROMAN_NUMERALS
+    extracted = set()  # (acronym, line) pairs whose full form was already extracted
+
+    # Defined usages and undefined acronyms are detected in the same pass over
+    # the content after \begin{document}
+    for path, text, newlines, begin, end in content_runs:
+        if acronym_defs:
+            lowered = lowered_texts[path]
+            for pos, _, keys in _match_automaton(full_automaton, lowered, begin, end):
+                for key in keys:
+                    _add_usage(used_full[key], path, text, newlines, pos)
+            for pos, _, keys in _match_automaton(short_automaton, lowered, begin, end):
+                for key in keys:
+                    _add_usage(used_short[key], path, text, newlines, pos)
+
+        for match in _UNDEFINED_RE.finditer(text, begin, end):
+            acronym = match.group(1).strip()
+            if acronym not in excluded:
+                line_no, line = _locate(text, newlines, match.start())
+                line = line.strip()
+                undefined_counts[acronym].append((path, line_no, line))
+
+                # The same line always yields the same full form, so only extract it once
+                if (acronym, line) in extracted:
+                    continue
+                extracted.add((acronym, line))
                 
                 # Try to extract the full form that precedes this acronym
                 # Pattern: "Full Form Words (ACRONYM)" - capture only the actual definition
@@ -119,40 +293,22 @@ def scan_acronyms(entries, acronym_defs):
                 
                 # Simple approach: look for the pattern (ACRONYM) and take up to 5 words before it
                 # Find the position of the acronym in parentheses
-                acronym_pattern = rf'\({re.escape(acronym)}\)'
-                match_obj = re.search(acronym_pattern, line)
+                acronym_pattern = acronym_patterns.get(acronym)
+                if acronym_pattern is None:
+                    acronym_pattern = acronym_patterns[acronym] = re.compile(rf'\({_escape(acronym)}\)')
+                match_obj = acronym_pattern.search(line)
                 
                 if match_obj:
-                    # Get the text before the parentheses
-                    text_before = line[:match_obj.start()].strip()
+                    # Use capital letter logic: take the words right before the parentheses
+                    # that start with capital letters or are common connecting words
+                    full_form_words = _full_form_words(line, match_obj.start())
                     
-                    # Split into words and take the last 5 words
-                    words = text_before.split()
-                    if words:
-                        # Take last 5 words (or fewer if less available)
-                        candidate_words = words[-5:]
-                        
-                        # Use capital letter logic: find sequence of words that start with capital letters
-                        # and could form the acronym definition
-                        full_form_words = []
-                        for word in reversed(candidate_words):  # Go backwards to build the definition
-                            # Include words that start with capital letters or are common connecting words
-                            if (word[0].isupper() or 
-                                word.lower() in ['of', 'and', 'for', 'the', '&', 'to', 'in', 'on', 'with', 'at', 'by', 'from', 'de']):
-                                full_form_words.append(word)
-                            else:
-                                break  # Stop when we hit a lowercase word that's not a connector
-                        
-                        if full_form_words:
-                            # Reverse to get correct order and join
-                            full_form = ' '.join(reversed(full_form_words))
-                            
-                            # Basic validation: should have at least one capital letter word
-                            capital_words = [w for w in full_form_words if w[0].isupper()]
-                            if capital_words and len(full_form_words) <= 6:  # Reasonable length
-                                if acronym not in undefined_full_forms:
-                                    undefined_full_forms[acronym] = set()
-                                undefined_full_forms[acronym].add(full_form)
+                    # Basic validation: should have at least one capital letter word
+                    if any(word[0].isupper() for word in full_form_words):
+                        full_form = ' '.join(full_form_words)
+                        if acronym not in undefined_full_forms:
+                            undefined_full_forms[acronym] = set()
+                        undefined_full_forms[acronym].add(full_form)
     
     # Only report acronyms that appear 2 or more times
     for acronym, occurrences in undefined_counts.items():
@@ -162,17 +318,32 @@ def scan_acronyms(entries, acronym_defs):
     # --- Check for standalone usage of full forms (inconsistent usage)
     inconsistent_usage = defaultdict(list)
     
-    # For each undefined acronym that we found full forms for
+    # Look for all full forms of the undefined acronyms at once with an automaton,
+    # keeping one list of usages per (acronym, full form) pair
+    usages = {}
+    words = defaultdict(list)
     for acronym, full_forms in undefined_full_forms.items():
+        # Standalone usage means the full form is not followed by the acronym in
+        # parentheses on the same line; lowercased to match the lowercased content
+        followed_pattern = re.compile(rf'[^\S\n]*\({_escape(_lower_text(acronym))}\)')
         for full_form in full_forms:
-            # Create a pattern to find standalone usage of this full form
-            # (not followed by the acronym in parentheses)
-            standalone_pattern = rf'\b{re.escape(full_form)}\b(?!\s*\({re.escape(acronym)}\))'
-            
-            # Search for standalone usage in all content
-            for path, line_no, line in content_entries:
-                if re.search(standalone_pattern, line, re.IGNORECASE):
-                    inconsistent_usage[acronym].append((path, line_no, line.strip(), full_form))
+            usages[acronym, full_form] = []
+            words[_lower_text(full_form)].append((acronym, full_form, followed_pattern))
+
+    if words:
+        standalone_automaton = _build_automaton(words)
+
+        # Search for standalone usage in all content, once per run of lines
+        for path, text, newlines, begin, end in content_runs:
+            lowered = lowered_texts[path]
+            for pos, form_end, forms in _match_automaton(standalone_automaton, lowered, begin, end):
+                for acronym, full_form, followed_pattern in forms:
+                    if not followed_pattern.match(lowered, form_end, end):
+                        _add_usage(usages[acronym, full_form], path, text, newlines, pos)
+
+    for (acronym, full_form), form_usages in usages.items():
+        for path, line_no, line in form_usages:
+            inconsistent_usage[acronym].append((path, line_no, line, full_form))
 
     report = {
         "used_full": used_full,
@@ -184,65 +355,72 @@ def scan_acronyms(entries, acronym_defs):
     return report
 
 
-def extract_sentence_containing_text(text, target_text):
-    """Extract the sentence containing the target text with practical balance between accuracy and readability."""
+# Common abbreviations that shouldn't end sentences
+_ABBREV_SUFFIXES = ('e.g', 'i.e', 'etc', 'vs', 'cf', 'al', 'fig', 'eq', 'sec', 'ch', 'vol', 'ed', 'pp', 'no', 'mr', 'mrs', 'dr', 'prof', 'inc', 'ltd', 'corp')
+
+
+# Better sentence boundary detection that handles special cases
+def _is_sentence_boundary(text, pos):
+    """Check if position is a real sentence boundary."""
+    if pos >= len(text) or text[pos] not in '.!?':
+        return False
+        
+    # Check for common abbreviations and special cases
+    before_context = text[max(0, pos-10):pos].lower()
+    after_context = text[pos+1:pos+5] if pos+1 < len(text) else ""
     
-    # Find the position of the target text
-    target_pos = text.find(target_text)
-    if target_pos == -1:
-        return text.strip()
+    if before_context.endswith(_ABBREV_SUFFIXES):
+        return False
     
-    # Better sentence boundary detection that handles special cases
-    def is_sentence_boundary(text, pos):
-        """Check if position is a real sentence boundary."""
-        if pos >= len(text) or text[pos] not in '.!?':
+    # Check for email addresses (simple pattern)
+    if pos > 0 and pos < len(text) - 1 and '@' in before_context:
+        # Look for patterns like "name@domain.com": the last word before the
+        # position has an "@" with something on both sides
+        last_word = '' if before_context[-1].isspace() else before_context.split()[-1]
+        if '@' in last_word[1:-1] and not after_context.startswith(' '):
             return False
-            
-        # Check for common abbreviations and special cases
-        before_context = text[max(0, pos-10):pos].lower()
-        after_context = text[pos+1:pos+5] if pos+1 < len(text) else ""
-        
-        # Common abbreviations that shouldn't end sentences
-        abbreviations = ['e.g', 'i.e', 'etc', 'vs', 'cf', 'al', 'fig', 'eq', 'sec', 'ch', 'vol', 'ed', 'pp', 'no', 'mr', 'mrs', 'dr', 'prof', 'inc', 'ltd', 'corp']
-        
-        for abbr in abbreviations:
-            if before_context.endswith(abbr):
-                return False
-        
-        # Check for email addresses (simple pattern)
-        if pos > 0 and pos < len(text) - 1:
-            # Look for patterns like "name@domain.com" 
-            email_before = re.search(r'\S+@\S+$', before_context)
-            if email_before and not after_context.startswith(' '):
-                return False
+    
+    # Check for URLs
+    if 'http' in before_context or 'www' in before_context:
+        return False
         
-        # Check for URLs
-        if 'http' in before_context or 'www' in before_context:
+    # Check for decimal numbers
+    if pos > 0 and pos < len(text) - 1:
+        if (text[pos-1].isdigit() and text[pos+1].isdigit()):
             return False
-            
-        # Check for decimal numbers
-        if pos > 0 and pos < len(text) - 1:
-            if (text[pos-1].isdigit() and text[pos+1].isdigit()):
-                return False
+    
+    # Check if next character is lowercase (likely continuation)
+    if after_context and after_context[0].islower():
+        return False
         
-        # Check if next character is lowercase (likely continuation)
-        if after_context and after_context[0].islower():
-            return False
-            
-        # If we made it here, it's likely a real sentence boundary
-        return True
+    # If we made it here, it's likely a real sentence boundary
+    return True
+
+
+def extract_sentence_containing_text(text, target_text):
+    """Extract the sentence containing the target text with practical balance between accuracy and readability."""
+    return _extract_sentence(text, target_text)
+
+
+@lru_cache(maxsize=8192)
+def _extract_sentence(text, target_text):
+    """Cached implementation of `extract_sentence_containing_text`."""
+    # Find the position of the target text
+    target_pos = text.find(target_text)
+    if target_pos == -1:
+        return text.strip()
     
     # Find sentence start (go backwards from target)
     sentence_start = 0
     for i in range(target_pos - 1, -1, -1):
-        if is_sentence_boundary(text, i):
+        if _is_sentence_boundary(text, i):
             sentence_start = i + 1
             break
     
     # Find sentence end (go forwards from target)
     sentence_end = len(text)
     for i in range(target_pos, len(text)):
-        if is_sentence_boundary(text, i):
+        if _is_sentence_boundary(text, i):
             sentence_end = i + 1
             break
     
@@ -303,6 +481,14 @@ def generate_pdf_report(acronym_defs, report, output_filename="acronym_report.pd
     styles = getSampleStyleSheet()
     story = []
     
+    # File names are shown for every occurrence, so look each one up only once
+    file_names = {}
+    def file_name(path):
+        name = file_names.get(path)
+        if name is None:
+            name = file_names[path] = path.name
+        return name
+    
     # Custom styles
     title_style = ParagraphStyle(
         'CustomTitle',
@@ -379,7 +565,7 @@ def generate_pdf_report(acronym_defs, report, output_filename="acronym_report.pd
         story.append(Paragraph("Defined but Never Used", heading_style))
         for k in defined_never_used:
             d = acronym_defs[k]
-            story.append(Paragraph(f"• <b>{d['short']}</b> ({d['full']}) [<b><font color='blue'>{d['file'].name}</font></b>]", styles['Normal']))
+            story.append(Paragraph(f"• <b>{d['short']}</b> ({d['full']}) [<b><font color='blue'>{file_name(d['file'])}</font></b>]", styles['Normal']))
         story.append(Spacer(1, 20))
     
     # Section 1: Not in glossaries and defined multiple times  
@@ -391,6 +577,26 @@ def generate_pdf_report(acronym_defs, report, output_filename="acronym_report.pd
         for acronym, path, line_no, line in report["undefined"]:
             undefined_grouped[acronym].append((path, line_no, line))
         
+        # Compile the highlighting patterns once per acronym, not once per occurrence
+        hl_patterns = {}
+        for acronym in undefined_grouped:
+            escaped_acronym = _escape(acronym)
+            # Get all known full forms for this acronym
+            full_forms_found = report.get("undefined_full_forms", {}).get(acronym, set())
+            # Case-insensitive patterns for all variations of each known full form
+            hl_patterns[acronym] = (
+                re.compile(rf'\({escaped_acronym}\)'),
+                [
+                    (
+                        # Pattern 1: Full form with acronym (e.g., "Variational Autoencoder (VAE)")
+                        re.compile(rf'({_escape(full_form)})\s*\({escaped_acronym}\)', re.IGNORECASE),
+                        # Pattern 2: Just the full form without acronym (e.g., "variational autoencoder")
+                        re.compile(rf'\b({_escape(full_form)})\b(?!\s*\({escaped_acronym}\))', re.IGNORECASE),
+                    )
+                    for full_form in full_forms_found
+                ],
+            )
+        
         for i, (acronym, occurrences) in enumerate(undefined_grouped.items(), 1):
             # Only show the acronym name, not the extracted full forms
             story.append(Paragraph(f"{i}. <b>{acronym}</b>", styles['Normal']))
@@ -400,37 +606,26 @@ def generate_pdf_report(acronym_defs, report, output_filename="acronym_report.pd
                 sentence = extract_sentence_containing_text(line, f"({acronym})")
                 
                 # Clean the sentence and highlight the acronym more carefully
-                import html
                 clean_sentence = html.escape(sentence)  # Escape HTML chars first
                 
-                # Get all known full forms for this acronym
-                full_forms_found = report.get("undefined_full_forms", {}).get(acronym, set())
+                paren_pattern, full_form_patterns = hl_patterns[acronym]
                 
                 # Start with the original sentence
                 highlighted_sentence = clean_sentence
                 
                 # Highlight all variations of known full forms
-                for full_form in full_forms_found:
-                    # Create case-insensitive patterns for all variations
-                    escaped_form = re.escape(full_form)
-                    
-                    # Pattern 1: Full form with acronym (e.g., "Variational Autoencoder (VAE)")
-                    pattern_with_acronym = rf'({escaped_form})\s*\({re.escape(acronym)}\)'
-                    highlighted_sentence = re.sub(pattern_with_acronym, 
+                for pattern_with_acronym, pattern_standalone in full_form_patterns:
+                    highlighted_sentence = pattern_with_acronym.sub(
                                                 r'<font color="red">\1 (' + acronym + ')</font>', 
-                                                highlighted_sentence, flags=re.IGNORECASE)
-                    
-                    # Pattern 2: Just the full form without acronym (e.g., "variational autoencoder")
-                    pattern_standalone = rf'\b({escaped_form})\b(?!\s*\({re.escape(acronym)}\))'
-                    highlighted_sentence = re.sub(pattern_standalone, 
+                                                highlighted_sentence)
+                    highlighted_sentence = pattern_standalone.sub(
                                                 r'<font color="red">\1</font>', 
-                                                highlighted_sentence, flags=re.IGNORECASE)
+                                                highlighted_sentence)
                 
                 # Also look for any other potential full forms in this specific line
                 # Pattern: "Full phrase followed by (ACRONYM)" -> highlight entire thing in red
                 # Use the same improved pattern to avoid over-capturing
                 # Use the same simple approach as in scanning
-                pattern = rf'\({re.escape(acronym)}\)'
                 
                 def highlight_definition(match_obj):
                     # Get the text before the parentheses in the sentence
@@ -464,49 +659,37 @@ def generate_pdf_report(acronym_defs, report, output_filename="acronym_report.pd
                     return highlighted_sentence[:match_obj.start()] + f'<font color="red"><b>{html.escape(match_obj.group(0))}</b></font>' + highlighted_sentence[match_obj.end():]
                 
                 # Apply highlighting - but we need to do this more carefully
-                matches = list(re.finditer(pattern, highlighted_sentence))
+                matches = list(paren_pattern.finditer(highlighted_sentence))
                 if matches:
                     # Process from right to left to maintain positions
                     for match_obj in reversed(matches):
                         before = highlighted_sentence[:match_obj.start()]
-                        words_before = before.strip().split()
+                        full_form_words = _full_form_words(highlighted_sentence, match_obj.start())
                         
-                        if words_before:
-                            candidate_words = words_before[-5:]
-                            full_form_words = []
-                            
-                            for word in reversed(candidate_words):
-                                if (word[0].isupper() or 
-                                    word.lower() in ['of', 'and', 'for', 'the', '&', 'to', 'in', 'on', 'with', 'at', 'by', 'from', 'de']):
-                                    full_form_words.append(word)
-                                else:
-                                    break
-                            
-                            if full_form_words:
-                                full_form = ' '.join(reversed(full_form_words))
-                                # Find where the full form starts in the original sentence
-                                full_form_pos = before.rfind(full_form)
-                                if full_form_pos >= 0:
-                                    prefix = highlighted_sentence[:full_form_pos]
-                                    highlighted_def = f'<font color="red">{html.escape(full_form)}</font>'
-                                    space_and_acronym = highlighted_sentence[full_form_pos + len(full_form):match_obj.end()]
-                                    highlighted_acronym = re.sub(rf'\({re.escape(acronym)}\)', 
-                                                                f'<font color="red">({acronym})</font>', 
-                                                                space_and_acronym)
-                                    suffix = highlighted_sentence[match_obj.end():]
-                                    highlighted_sentence = prefix + highlighted_def + highlighted_acronym + suffix
-                                    break  # Only process first match to avoid conflicts
+                        if full_form_words:
+                            full_form = ' '.join(full_form_words)
+                            # Find where the full form starts in the original sentence
+                            full_form_pos = before.rfind(full_form)
+                            if full_form_pos >= 0:
+                                prefix = highlighted_sentence[:full_form_pos]
+                                highlighted_def = f'<font color="red">{html.escape(full_form)}</font>'
+                                space_and_acronym = highlighted_sentence[full_form_pos + len(full_form):match_obj.end()]
+                                highlighted_acronym = paren_pattern.sub(
+                                                            f'<font color="red">({acronym})</font>', 
+                                                            space_and_acronym)
+                                suffix = highlighted_sentence[match_obj.end():]
+                                highlighted_sentence = prefix + highlighted_def + highlighted_acronym + suffix
+                                break  # Only process first match to avoid conflicts
                 def highlight_full_definition(match):
                     full_definition = match.group(0).strip()  # Get the entire match including parentheses
                     return f'<font color="red">{full_definition}</font>'
                 
                 # If no full definition was found, just highlight the acronym in parentheses
                 if '(' + acronym + ')' in clean_sentence and '<font color="red">' not in highlighted_sentence:
-                    pattern = rf'\({re.escape(acronym)}\)'
-                    highlighted_sentence = re.sub(pattern, f'(<font color="red">{acronym}</font>)', highlighted_sentence)
+                    highlighted_sentence = paren_pattern.sub(f'(<font color="red">{acronym}</font>)', highlighted_sentence)
                 
                 # Show the sentence
-                story.append(Paragraph(f"&nbsp;&nbsp;&nbsp;<b><font color='blue'>{path.name}</font></b>: {highlighted_sentence}", styles['Normal']))
+                story.append(Paragraph(f"&nbsp;&nbsp;&nbsp;<b><font color='blue'>{file_name(path)}</font></b>: {highlighted_sentence}", styles['Normal']))
             story.append(Spacer(1, 10))
 
     # Section 2: In glossaries, but full name used
@@ -524,15 +707,16 @@ def generate_pdf_report(acronym_defs, report, output_filename="acronym_report.pd
         if full_uses and len(full_uses) > 1:
             story.append(Paragraph(f"<b>{short}</b> ({full})", styles['Normal']))
             
+            # Highlight the full form in red (preserve original case)
+            full_pattern = re.compile(_escape(full), re.IGNORECASE)
+            def highlight_preserving_case(match):
+                return f'<font color="red">{match.group(0)}</font>'
+            
             # Show all full form uses (highlight the full form in red)
             for f, l, t in full_uses:
                 sentence = extract_sentence_containing_text(t, full)
-                # Highlight the full form in red (preserve original case)
-                def highlight_preserving_case(match):
-                    return f'<font color="red">{match.group(0)}</font>'
-                
-                highlighted_sentence = re.sub(re.escape(full), highlight_preserving_case, sentence, flags=re.IGNORECASE)
-                story.append(Paragraph(f"&nbsp;&nbsp;&nbsp;<b><font color='blue'>{f.name}</font></b> — {highlighted_sentence}", styles['Normal']))
+                highlighted_sentence = full_pattern.sub(highlight_preserving_case, sentence)
+                story.append(Paragraph(f"&nbsp;&nbsp;&nbsp;<b><font color='blue'>{file_name(f)}</font></b> — {highlighted_sentence}", styles['Normal']))
             
             story.append(Spacer(1, 10))
     